@@ -34,13 +34,17 @@ dev_requirements = [
 
 requirements = ["numpy", "scipy"]
 
+fast_requirements = ["numba"]
+
 extra_requirements = {
+    "fast": fast_requirements,
     "test": test_requirements,
     "docs": docs_requirements,
     "setup": setup_requirements,
     "dev": dev_requirements,
     "all": [
         *requirements,
+        *fast_requirements,
         *test_requirements,
         *docs_requirements,
         *setup_requirements,
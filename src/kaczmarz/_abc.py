@@ -1,7 +1,10 @@
 from abc import ABC, abstractmethod
 
 import numpy as np
+import scipy.sparse as sp
+from scipy.linalg import get_blas_funcs
 
+from . import _fast
 from ._normalize import normalize_system
 
 
@@ -29,6 +32,10 @@ class Base(ABC):
         User-supplied function to call after each iteration.
         It is called as ``callback(xk)``,
         where xk is the current solution vector.
+    dtype : data-type, optional
+        Data type used to store the normalized system and the iterates.
+        Single precision halves the memory traffic of the per-iteration
+        matvecs at the cost of accuracy.
 
     Notes
     -----
@@ -44,17 +51,26 @@ class Base(ABC):
         tol=1e-5,
         maxiter=None,
         callback=None,
+        dtype=np.float64,
     ):
-        self._A, self._b, self._row_norms = normalize_system(A, b)
+        self._A, self._b, self._row_norms = normalize_system(A, b, dtype=dtype)
+        self._row_norms_sq = self._row_norms ** 2
         self._n_rows = len(self._b)
 
+        if not sp.issparse(self._A):
+            # Bind the precision-matched BLAS-1 routines once;
+            # going through np.dot adds dispatch overhead on every projection.
+            self._blas_dot, self._blas_axpy = get_blas_funcs(
+                ("dot", "axpy"), (self._A,)
+            )
+
         if x0 is None:
             n_cols = self._A.shape[1]
-            x0 = np.zeros(n_cols)
+            x0 = np.zeros(n_cols, dtype=dtype)
             self._iterate_shape = list(np.shape(b))  # [m,] or [m, 1]
             self._iterate_shape[0] = n_cols
         else:
-            x0 = np.array(x0, dtype="float64")
+            x0 = np.array(x0, dtype=dtype)
             self._iterate_shape = x0.shape
 
         self._x0 = x0.ravel()
@@ -64,6 +80,7 @@ class Base(ABC):
             maxiter = 2 * np.log(tol) / np.log(1 - 1 / (10 * min(self._A.shape)))
 
         self._maxiter = maxiter
+        self._has_callback = callback is not None
         if callback is None:
 
             def callback(xk):
@@ -146,10 +163,39 @@ class Base(ABC):
             or ``b`` otherwise.
         """
         iterates = cls.iterates(*base_args, **base_kwargs)
+        x = iterates._fast_solve()
+        if x is not None:
+            return x
         for x in iterates:
             pass
         return x
 
+    def _supports_fast_solve(self):
+        """Check whether the compiled solve loop can be used at all."""
+        return (
+            _fast.NUMBA_AVAILABLE
+            and not sp.issparse(self._A)
+            and not self._has_callback
+            # The compiled loops hard-code the projection and stopping rule,
+            # so subclasses overriding either must take the Python path.
+            and type(self)._update_iterate is Base._update_iterate
+            and type(self)._stopping_criterion is Base._stopping_criterion
+        )
+
+    def _fast_solve(self):
+        """Run the whole iteration in a compiled loop, if one applies.
+
+        Selection strategies with a numba fast path override this method.
+
+        Returns
+        -------
+        x : (n,) or (n, 1) array or None
+            The solution to the system ``A @ x = b``,
+            or None when no compiled path applies,
+            in which case :meth:`solve` falls back to the Python iteration.
+        """
+        return None
+
     def __next__(self):
         """Perform an iteration of the Kaczmarz algorithm.
 
@@ -214,7 +260,12 @@ class Base(ABC):
         """
         ai = self._A[ik]
         bi = self._b[ik]
-        return xk + (bi - ai @ xk) * ai
+        if sp.issparse(self._A):
+            return xk + (bi - ai @ xk) * ai
+        # The BLAS routines update their output in place, so copy first:
+        # ``xk`` may alias ``x0`` or a previous iterate.
+        xkp1 = xk.copy()
+        return self._blas_axpy(ai, xkp1, a=bi - self._blas_dot(ai, xk))
 
     def _stopping_criterion(self, k, xk):
         """Check if the iteration should terminate.
@@ -0,0 +1,138 @@
+"""Optional numba-accelerated kernels.
+
+These kernels are used only when :mod:`numba` is installed.
+Callers are expected to fall back to an equivalent numpy
+implementation when ``NUMBA_AVAILABLE`` is ``False``.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, fastmath=True)
+    def _residual_norm_sq(A, b, x):
+        m, n = A.shape
+        total = 0.0
+        for i in range(m):
+            dot = 0.0
+            for j in range(n):
+                dot += A[i, j] * x[j]
+            r = b[i] - dot
+            total += r * r
+        return total
+
+    @njit(cache=True, fastmath=True)
+    def _project(A, b, x, ik):
+        # The rows of A are normalized, so the step size is the residual entry.
+        n = A.shape[1]
+        dot = 0.0
+        for j in range(n):
+            dot += A[ik, j] * x[j]
+        alpha = b[ik] - dot
+        for j in range(n):
+            x[j] += alpha * A[ik, j]
+
+    @njit(cache=True, fastmath=True)
+    def run_cyclic(A, b, x0, order, start_pos, tol, maxiter):
+        """Run the whole Cyclic iteration in one compiled loop.
+
+        Parameters
+        ----------
+        A : (m, n) array
+        b : (m,) array
+        x0 : (n,) array
+        order : (c,) array of int
+            Row selection order, cycled through repeatedly.
+        start_pos : int
+            Position in ``order`` to start from.
+        tol : float
+        maxiter : float
+
+        Returns
+        -------
+        x : (n,) array
+        """
+        x = x0.copy()
+        tol_sq = tol * tol
+        pos = start_pos
+        k = 0
+        while k < maxiter:
+            if _residual_norm_sq(A, b, x) < tol_sq:
+                break
+            ik = order[pos]
+            pos = pos + 1 if pos + 1 < len(order) else 0
+            _project(A, b, x, ik)
+            k += 1
+        return x
+
+    @njit(cache=True, fastmath=True)
+    def run_random(A, b, x0, prob, alias, tol, maxiter, seed):
+        """Run the whole Random iteration in one compiled loop.
+
+        Parameters
+        ----------
+        A : (m, n) array
+        b : (m,) array
+        x0 : (n,) array
+        prob, alias : (m,) arrays
+            Walker alias tables of the sampling distribution.
+        tol : float
+        maxiter : float
+        seed : int
+            Seed for numba's internal RNG, which is separate from numpy's.
+
+        Returns
+        -------
+        x : (n,) array
+        """
+        np.random.seed(seed)
+        x = x0.copy()
+        m = A.shape[0]
+        tol_sq = tol * tol
+        k = 0
+        while k < maxiter:
+            if _residual_norm_sq(A, b, x) < tol_sq:
+                break
+            u = np.random.random() * m
+            bucket = int(u)
+            if u - bucket < prob[bucket]:
+                ik = bucket
+            else:
+                ik = alias[bucket]
+            _project(A, b, x, ik)
+            k += 1
+        return x
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def sampled_abs_residual(A, b, xk, idxs):
+        """Compute ``np.abs(b[idxs] - A[idxs] @ xk)`` without gathering rows.
+
+        Parameters
+        ----------
+        A : (m, n) array
+        b : (m,) array
+        xk : (n,) array
+        idxs : (k,) array of int
+
+        Returns
+        -------
+        distances : (k,) array
+        """
+        n_samples = len(idxs)
+        n_cols = A.shape[1]
+        distances = np.empty(n_samples)
+        for s in prange(n_samples):
+            i = idxs[s]
+            dot = 0.0
+            for j in range(n_cols):
+                dot += A[i, j] * xk[j]
+            distances[s] = abs(b[i] - dot)
+        return distances
@@ -40,13 +40,15 @@ def normalize_matrix(A, row_norms):
     return normalization_matrix @ A
 
 
-def normalize_system(A, b):
+def normalize_system(A, b, dtype=np.float64):
     """Scale the system ``A @ x = b`` so that the rows of ``A`` have norm 1.
 
     Parameters
     ----------
     A : (m, n) spmatrix or array_like
     b : (m,) or (m, 1) array_like
+    dtype : data-type, optional
+        Data type of the normalized system.
 
     Returns
     -------
@@ -60,6 +62,11 @@ def normalize_system(A, b):
 
     row_norms = compute_row_norms(A)
     A = normalize_matrix(A, row_norms=row_norms)
-    b = np.array(b).ravel() / row_norms
+    if sp.issparse(A):
+        A = A.astype(dtype)
+    else:
+        # Row-major storage keeps both ``A @ xk`` and row slicing contiguous.
+        A = np.ascontiguousarray(A, dtype=dtype)
+    b = (np.array(b).ravel() / row_norms).astype(dtype, copy=False)
 
     return A, b, row_norms
@@ -0,0 +1,94 @@
+"""A streaming quantile estimator based on the P-squared algorithm."""
+
+import numpy as np
+
+
+class P2Quantile:
+    """Estimate a quantile of a stream in O(1) time and space per update.
+
+    The estimator maintains five markers whose heights track the minimum,
+    the maximum, the target quantile, and the midpoints between them,
+    adjusting the middle markers with parabolic interpolation as
+    observations arrive. No observations are stored.
+
+    Parameters
+    ----------
+    quantile : float
+        Quantile to estimate, between 0 and 1.
+
+    References
+    ----------
+    1. R. Jain and I. Chlamtac.
+       "The P² algorithm for dynamic calculation of quantiles and
+       histograms without storing observations."
+       *Communications of the ACM*, 28(10):1076-1085, 1985.
+    """
+
+    def __init__(self, quantile):
+        self._quantile = quantile
+        self._initial = []
+        self._heights = None
+        self._positions = None
+        self._desired = None
+        self._increments = None
+
+    def update(self, value):
+        """Incorporate one observation into the estimate."""
+        if self._heights is None:
+            self._initial.append(value)
+            if len(self._initial) == 5:
+                q = self._quantile
+                self._heights = np.sort(self._initial).astype(float)
+                self._positions = np.arange(1.0, 6.0)
+                self._desired = np.array([1.0, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5.0])
+                self._increments = np.array([0.0, q / 2, q, (1 + q) / 2, 1.0])
+            return
+
+        heights = self._heights
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = np.searchsorted(heights, value, side="right") - 1
+
+        self._positions[cell + 1 :] += 1
+        self._desired += self._increments
+
+        for i in (1, 2, 3):
+            offset = self._desired[i] - self._positions[i]
+            if (offset >= 1 and self._positions[i + 1] - self._positions[i] > 1) or (
+                offset <= -1 and self._positions[i - 1] - self._positions[i] < -1
+            ):
+                direction = 1 if offset >= 0 else -1
+                candidate = self._parabolic(i, direction)
+                if heights[i - 1] < candidate < heights[i + 1]:
+                    heights[i] = candidate
+                else:
+                    heights[i] = self._linear(i, direction)
+                self._positions[i] += direction
+
+    def _parabolic(self, i, direction):
+        heights, positions = self._heights, self._positions
+        return heights[i] + direction / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + direction)
+            * (heights[i + 1] - heights[i])
+            / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - direction)
+            * (heights[i] - heights[i - 1])
+            / (positions[i] - positions[i - 1])
+        )
+
+    def _linear(self, i, direction):
+        heights, positions = self._heights, self._positions
+        return heights[i] + direction * (heights[i + direction] - heights[i]) / (
+            positions[i + direction] - positions[i]
+        )
+
+    def estimate(self):
+        """Return the current quantile estimate."""
+        if self._heights is None:
+            return np.quantile(self._initial, self._quantile)
+        return self._heights[2]
@@ -1,3 +1,4 @@
+import numpy as np
 from scipy import sparse
 
 
@@ -18,3 +19,55 @@ def square(A):
     if sparse.issparse(A):
         return A.power(2)
     return A ** 2
+
+
+def build_alias_table(p):
+    """Build Walker alias tables for O(1) sampling from a fixed distribution.
+
+    Each draw picks a bucket uniformly and accepts it with probability
+    ``prob[bucket]``, falling back to ``alias[bucket]`` otherwise.
+
+    Parameters
+    ----------
+    p : (m,) array_like
+        Sampling weights. They need not be normalized.
+
+    Returns
+    -------
+    prob : (m,) array
+        Acceptance probability of each bucket.
+    alias : (m,) array of int
+        Fallback index of each bucket.
+
+    Raises
+    ------
+    ValueError
+        If the weights are negative, non-finite, or sum to zero.
+    """
+    p = np.asarray(p, dtype=float)
+    if not np.all(np.isfinite(p)):
+        raise ValueError("Sampling weights must be finite.")
+    if np.any(p < 0):
+        raise ValueError("Sampling weights must be non-negative.")
+    total = p.sum()
+    if total <= 0:
+        raise ValueError("Sampling weights must have a positive sum.")
+    n_buckets = len(p)
+    scaled = p * (n_buckets / total)
+    prob = np.ones(n_buckets)
+    alias = np.arange(n_buckets)
+
+    small = list(np.flatnonzero(scaled < 1))
+    large = list(np.flatnonzero(scaled >= 1))
+    while small and large:
+        underfull = small.pop()
+        overfull = large.pop()
+        prob[underfull] = scaled[underfull]
+        alias[underfull] = overfull
+        scaled[overfull] -= 1 - scaled[underfull]
+        if scaled[overfull] < 1:
+            small.append(overfull)
+        else:
+            large.append(overfull)
+
+    return prob, alias
@@ -1,13 +1,13 @@
 """A module providing selection strategies for the Kaczmarz algorithm."""
 
-from collections import deque
-
 import numpy as np
 from scipy import sparse
 
 import kaczmarz
 
-from ._utils import scale_cols, scale_rows, square
+from . import _fast
+from ._psquare import P2Quantile
+from ._utils import build_alias_table
 
 
 class Cyclic(kaczmarz.Base):
@@ -25,14 +25,39 @@ class Cyclic(kaczmarz.Base):
 
     def __init__(self, *base_args, order=None, **base_kwargs):
         super().__init__(*base_args, **base_kwargs)
-        self._row_index = -1
         if order is None:
             order = range(self._n_rows)
         self._order = order
+        self._order_length = len(order)
+        self._next_position = 0
 
     def _select_row_index(self, xk):
-        self._row_index = (1 + self._row_index) % self._n_rows
-        return self._order[self._row_index]
+        # A compare-and-reset wraps the cursor more cheaply than a modulo.
+        position = self._next_position
+        self._next_position = position + 1 if position + 1 < self._order_length else 0
+        return self._order[position]
+
+    def _fast_solve(self):
+        if not self._supports_fast_solve():
+            return None
+        if type(self)._select_row_index is not Cyclic._select_row_index:
+            # A subclass with its own selection rule must take the Python path.
+            return None
+        order = np.asarray(self._order, dtype=np.intp)
+        if np.any(order < 0) or np.any(order >= self._n_rows):
+            # The kernel indexes rows unchecked; let the Python path wrap
+            # negative entries and raise for out-of-range ones.
+            return None
+        self._xk = _fast.run_cyclic(
+            self._A,
+            self._b,
+            self._x0,
+            order,
+            self._next_position,
+            float(self._tol),
+            float(self._maxiter),
+        )
+        return self.xk
 
 
 class MaxDistanceLookahead(kaczmarz.Base):
@@ -41,8 +66,12 @@ class MaxDistanceLookahead(kaczmarz.Base):
     def __init__(self, *base_args, **base_kwargs):
         super().__init__(*base_args, **base_kwargs)
         self._next_i = None
-        self._gramian = self._A @ self._A.T
-        self._gramian2 = square(self._gramian)
+        gramian = self._A @ self._A.T
+        if sparse.issparse(gramian):
+            gramian = gramian.toarray()
+        self._gramian = gramian
+        self._gramian2 = np.square(gramian)
+        self._residual = self._b - self._A @ self._x0
 
     def _select_row_index(self, xk):
         if self._next_i is not None:
@@ -50,21 +79,37 @@ class MaxDistanceLookahead(kaczmarz.Base):
             self._next_i = None
             return temp
 
-        residual = self._b - self._A @ xk
+        residual = self._residual
         residual_2 = np.square(residual)
-        cost_mat = np.array(
+        cost_mat = (
             residual_2[:, None]
             + residual_2[None, :]
-            - 2 * scale_rows(scale_cols(self._gramian, residual), residual)
-            + scale_rows(self._gramian2, residual_2)
+            - 2 * residual[:, None] * self._gramian * residual[None, :]
+            + residual_2[:, None] * self._gramian2
         )
         best_cost = np.max(cost_mat)
 
-        sort_idxs = np.argsort(residual_2)[::-1]
-        best_i = sort_idxs[np.any(cost_mat[sort_idxs, :] == best_cost, axis=1)][0]
-        self._next_i = np.argwhere(cost_mat[best_i] == best_cost)[0][0]
+        # Of the first-step rows achieving the best two-step cost,
+        # pick the one making the most progress on the first step.
+        achieves_best = cost_mat == best_cost
+        candidates = np.flatnonzero(achieves_best.any(axis=1))
+        best_i = candidates[np.argmax(residual_2[candidates])]
+        self._next_i = np.argmax(achieves_best[best_i])
         return best_i
 
+    def _update_iterate(self, xk, ik):
+        # Same incremental residual maintenance as MaxDistance: a projection
+        # changes the residual by a multiple of a Gramian column, so no
+        # per-step matvec is needed.
+        self._residual -= self._residual[ik] * self._gramian[:, ik]
+        return super()._update_iterate(xk, ik)
+
+    def _stopping_criterion(self, k, xk):
+        if self._k >= self._maxiter:
+            return True
+
+        return np.linalg.norm(self._residual) < self._tol
+
 
 class MaxDistance(kaczmarz.Base):
     """Choose equations which leads to the most progress.
@@ -78,10 +123,38 @@ class MaxDistance(kaczmarz.Base):
        *Canadian Journal of Mathematics*, 6:393–404, 1954.
     """
 
+    def __init__(self, *base_args, **base_kwargs):
+        super().__init__(*base_args, **base_kwargs)
+        gramian = self._A @ self._A.T
+        if sparse.issparse(gramian):
+            # Column-compressed storage gives O(nnz(column)) residual updates
+            # without ever materializing an m-by-m dense matrix.
+            gramian = gramian.tocsc()
+        self._gramian = gramian
+        self._residual = self._b - self._A @ self._x0
+
     def _select_row_index(self, xk):
-        # TODO: use auxiliary update for the residual.
-        residual = self._b - self._A @ self._xk
-        return np.argmax(np.abs(residual))
+        return np.argmax(np.abs(self._residual))
+
+    def _update_iterate(self, xk, ik):
+        # Projecting onto row ``ik`` changes the residual by a multiple of the
+        # corresponding Gramian column, so the residual can be maintained with
+        # a single O(m) update rather than recomputed with an O(mn) matvec.
+        # The rows of ``self._A`` are normalized, so the step size is just the
+        # residual entry.
+        if sparse.issparse(self._gramian):
+            start, end = self._gramian.indptr[ik], self._gramian.indptr[ik + 1]
+            rows = self._gramian.indices[start:end]
+            self._residual[rows] -= self._residual[ik] * self._gramian.data[start:end]
+        else:
+            self._residual -= self._residual[ik] * self._gramian[:, ik]
+        return super()._update_iterate(xk, ik)
+
+    def _stopping_criterion(self, k, xk):
+        if self._k >= self._maxiter:
+            return True
+
+        return np.linalg.norm(self._residual) < self._tol
 
 
 class Random(kaczmarz.Base):
@@ -93,12 +166,76 @@ class Random(kaczmarz.Base):
         Sampling probability for each equation. Uniform by default.
     """
 
+    _sample_batch_size = 1024
+
     def __init__(self, *base_args, p=None, **base_kwargs):
         super().__init__(*base_args, **base_kwargs)
         self._p = p  # p=None corresponds to uniform.
+        self._alias_prob = None
+        self._alias = None
+        self._sample_buf = np.empty(0, dtype=int)
+        self._sample_pos = 0
+
+    def _ensure_alias_tables(self):
+        # Built lazily because subclasses such as SVRandom
+        # assign ``self._p`` after construction.
+        if self._alias_prob is None:
+            # ``build_alias_table`` accepts unnormalized weights,
+            # but a ``p`` that does not sum to 1 is a user bug here;
+            # fail loudly like np.random.choice, with the same tolerance.
+            if abs(np.sum(self._p) - 1) > np.sqrt(np.finfo(np.float64).eps):
+                raise ValueError("probabilities do not sum to 1")
+            self._alias_prob, self._alias = build_alias_table(self._p)
+
+    def _refill_sample_buf(self):
+        # np.random.choice rebuilds the CDF of ``p`` on every call,
+        # so draw a batch of indexes at a time and serve them one by one.
+        if self._p is None:
+            self._sample_buf = np.random.randint(
+                0, self._n_rows, self._sample_batch_size
+            )
+        else:
+            self._ensure_alias_tables()
+            uniforms = np.random.random(self._sample_batch_size) * self._n_rows
+            buckets = uniforms.astype(int)
+            use_alias = uniforms - buckets >= self._alias_prob[buckets]
+            self._sample_buf = np.where(use_alias, self._alias[buckets], buckets)
+        self._sample_pos = 0
 
     def _select_row_index(self, xk):
-        return np.random.choice(self._n_rows, p=self._p)
+        if self._sample_pos == len(self._sample_buf):
+            self._refill_sample_buf()
+        ik = self._sample_buf[self._sample_pos]
+        self._sample_pos += 1
+        return ik
+
+    def _fast_solve(self):
+        if not self._supports_fast_solve():
+            return None
+        if type(self)._select_row_index is not Random._select_row_index:
+            # A subclass with its own selection rule (e.g. Quantile's
+            # rejection of equations) must take the Python path.
+            return None
+        if self._p is None:
+            prob = np.ones(self._n_rows)
+            alias = np.arange(self._n_rows)
+        else:
+            self._ensure_alias_tables()
+            prob, alias = self._alias_prob, self._alias
+        # Seed the compiled loop's RNG from the global numpy RNG so solves
+        # stay reproducible under np.random.seed.
+        seed = np.random.randint(2 ** 31)
+        self._xk = _fast.run_random(
+            self._A,
+            self._b,
+            self._x0,
+            prob,
+            alias,
+            float(self._tol),
+            float(self._maxiter),
+            seed,
+        )
+        return self.xk
 
 
 class SVRandom(Random):
@@ -113,8 +250,7 @@ class SVRandom(Random):
 
     def __init__(self, *base_args, **base_kwargs):
         super().__init__(*base_args, **base_kwargs)
-        squared_row_norms = self._row_norms ** 2
-        self._p = squared_row_norms / squared_row_norms.sum()
+        self._p = self._row_norms_sq / self._row_norms_sq.sum()
 
 
 class UniformRandom(Random):
@@ -144,21 +280,51 @@ class Quantile(Random):
     def __init__(self, *args, quantile=1.0, **kwargs):
         super().__init__(*args, **kwargs)
         self._quantile = quantile
+        self._distances = None
+        self._distances_buf = np.empty_like(self._b)
+
+    def _row_distance(self, xk, ik):
+        """Compute the normalized residual of equation ``ik`` at ``xk``."""
+        # ``item`` collapses the (1,) result produced by sparse rows.
+        return np.abs(self._b[ik] - self._A[ik] @ xk).item()
 
     def _distance(self, xk, ik):
-        return np.abs(self._b[ik] - self._A[ik] @ xk)
+        # The full residual is needed for the threshold anyway,
+        # so reuse it rather than paying for a separate row dot product.
+        return self._threshold_distances(xk)[ik]
 
     def _threshold_distances(self, xk):
-        return np.abs(self._b - self._A @ xk)
+        if self._distances is None:
+            # Reuse one preallocated buffer for the residual instead of
+            # allocating fresh intermediate arrays every iteration.
+            buf = self._distances_buf
+            if sparse.issparse(self._A):
+                np.subtract(self._b, self._A @ xk, out=buf)
+            else:
+                np.matmul(self._A, xk, out=buf)
+                np.subtract(self._b, buf, out=buf)
+            np.abs(buf, out=buf)
+            self._distances = buf
+        return self._distances
 
     def _threshold(self, xk):
-        distances = self._threshold_distances(xk)
-
-        return np.quantile(distances, self._quantile)
+        distances = np.ravel(self._threshold_distances(xk))
+
+        # Equivalent to ``np.quantile(distances, self._quantile)``, but a full
+        # quantile call sorts the whole array when we only need the two order
+        # statistics neighboring the quantile position.
+        position = self._quantile * (len(distances) - 1)
+        below = int(np.floor(position))
+        above = int(np.ceil(position))
+        neighbors = np.partition(distances, (below, above))
+        return neighbors[below] + (position - below) * (
+            neighbors[above] - neighbors[below]
+        )
 
     def _select_row_index(self, xk):
         ik = super()._select_row_index(xk)
 
+        self._distances = None  # At most one residual computation per iteration.
         distance = self._distance(xk, ik)
         threshold = self._threshold(xk)
 
@@ -187,8 +353,17 @@ class SampledQuantile(Quantile):
             n_samples = self._n_rows
         self._n_samples = n_samples
 
+    def _distance(self, xk, ik):
+        # The threshold only looks at a sample of the residual entries,
+        # so the distance of row ``ik`` must be computed separately.
+        return self._row_distance(xk, ik)
+
     def _threshold_distances(self, xk):
         idxs = np.random.choice(self._n_rows, self._n_samples, replace=False)
+        if _fast.NUMBA_AVAILABLE and not sparse.issparse(self._A):
+            # Stream the sampled dot products instead of materializing
+            # the (n_samples, n) gather of rows of A.
+            return _fast.sampled_abs_residual(self._A, self._b, xk, idxs)
         return np.abs(self._b[idxs] - self._A[idxs] @ xk)
 
 
@@ -199,6 +374,11 @@ class WindowedQuantile(Quantile):
     ----------
     window_size : int, optional
         Number of recent normalized residual values used to compute the threshold quantile.
+    approximate : bool, optional
+        Estimate the threshold with the streaming P-squared algorithm
+        instead of an exact quantile of the window.
+        Updates and threshold queries become O(1) per iteration,
+        at the cost of an approximate (and unwindowed) threshold.
 
     Note
     ----
@@ -209,19 +389,33 @@ class WindowedQuantile(Quantile):
     1. There will be a reference soon. Keep an eye out for that.
     """
 
-    def __init__(self, *args, window_size=None, **kwargs):
+    def __init__(self, *args, window_size=None, approximate=False, **kwargs):
         super().__init__(*args, **kwargs)
         if window_size is None:
             window_size = self._n_rows
-        self._window = deque([], maxlen=window_size)
+        # Ring buffer holding the most recent distances.
+        self._window = np.empty(window_size)
+        self._window_pos = 0
+        self._window_filled = 0
+        self._p2 = P2Quantile(self._quantile) if approximate else None
 
     def _distance(self, xk, ik):
-        distance = super()._distance(xk, ik)
-        self._window.append(distance)
+        distance = self._row_distance(xk, ik)
+        if self._p2 is not None:
+            self._p2.update(distance)
+            return distance
+        self._window[self._window_pos] = distance
+        self._window_pos = (self._window_pos + 1) % len(self._window)
+        self._window_filled = min(self._window_filled + 1, len(self._window))
         return distance
 
+    def _threshold(self, xk):
+        if self._p2 is not None:
+            return self._p2.estimate()
+        return super()._threshold(xk)
+
     def _threshold_distances(self, xk):
-        return self._window
+        return self._window[: self._window_filled]
 
 
 class RandomOrthoGraph(kaczmarz.Base):
@@ -245,35 +439,50 @@ class RandomOrthoGraph(kaczmarz.Base):
        arXiv preprint arXiv:1612.07838 2016.
     """
 
+    _gramian_block_size = 256
+
     def __init__(self, *args, p=None, **kwargs):
         super().__init__(*args, **kwargs)
-        self._gramian = self._A @ self._A.T
 
         # Map each row index i to indexes of rows that are NOT orthogonal to it.
-        self._i_to_neighbors = {
-            i: np.argwhere(self._gramian[i, :]).flatten() for i in range(self._n_rows)
-        }
+        # The Gramian is computed in blocks of rows so the full m-by-m matrix
+        # is never materialized; only the adjacency lists are kept.
+        self._i_to_neighbors = {}
+        AT = self._A.T
+        for start in range(0, self._n_rows, self._gramian_block_size):
+            gramian_block = self._A[start : start + self._gramian_block_size] @ AT
+            if sparse.issparse(gramian_block):
+                gramian_block = gramian_block.toarray()
+            for offset, gramian_row in enumerate(gramian_block):
+                self._i_to_neighbors[start + offset] = np.flatnonzero(gramian_row)
 
         # Initially, any row whose equation is not satisfied is selectable.
-        self._selectable = np.argwhere(self._A @ self._x0 - self._b).flatten()
+        self._selectable_mask = np.zeros(self._n_rows, dtype=bool)
+        self._selectable_mask[np.flatnonzero(self._A @ self._x0 - self._b)] = True
         if p is None:
             p = np.ones((self._n_rows,))
-        self._p = p
+        self._p = np.asarray(p, dtype=float)
+        # Running sum of the selectable probabilities,
+        # maintained so normalization is a single scalar divide.
+        self._p_sum = self._p[self._selectable_mask].sum()
 
     def _update_selectable(self, ik):
         # Every time a row is selected, all of its neighbors become selectable, and itself becomes unselectable.
-        newly_selectable = self._i_to_neighbors[ik]
-        selectable_with_ik = np.union1d(self._selectable, newly_selectable)
-        self._selectable = np.setdiff1d(selectable_with_ik, [ik], assume_unique=True)
+        neighbors = self._i_to_neighbors[ik]
+        newly_selectable = neighbors[~self._selectable_mask[neighbors]]
+        self._selectable_mask[newly_selectable] = True
+        self._p_sum += self._p[newly_selectable].sum()
+        self._selectable_mask[ik] = False
+        self._p_sum -= self._p[ik]
 
     def _select_row_index(self, xk):
-        unnormalized_p = self._p[self._selectable]
-        p = unnormalized_p / unnormalized_p.sum()
-        ik = np.random.choice(self._selectable, p=p)
+        selectable = np.flatnonzero(self._selectable_mask)
+        p = self._p[selectable] / self._p_sum
+        ik = np.random.choice(selectable, p=p)
         self._update_selectable(ik)
         return ik
 
     @property
     def selectable(self):
         """(s,) array: Selectable row indexes at the current iteration."""
-        return self._selectable.copy()
+        return np.flatnonzero(self._selectable_mask)
@@ -174,3 +174,12 @@ def test_iterates_are_copies(speye23, ones2, zeros3, DummyStrategy):
     xk[:] = np.inf
     xk = next(iterator)
     assert [1, 0, 0] == list(xk)
+
+
+def test_dtype(eye23, ones2, DummyStrategy):
+    """Passing ``dtype`` should control the precision of the iterates."""
+    iterator = iter(DummyStrategy.iterates(eye23, ones2))
+    assert np.float64 == next(iterator).dtype
+    iterator = iter(DummyStrategy.iterates(eye23, ones2, dtype=np.float32))
+    assert np.float32 == next(iterator).dtype
+    assert np.float32 == next(iterator).dtype
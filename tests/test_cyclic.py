@@ -38,3 +38,19 @@ def test_ordered_cyclic(eye23, ones2):
     assert [1, 1, 0] == list(next(iterator))
     with pytest.raises(StopIteration):
         next(iterator)
+
+
+def test_subclass_overrides_take_python_path(eye23, ones2):
+    """Subclasses overriding the iteration hooks must not get the compiled loop."""
+
+    class Damped(kaczmarz.Cyclic):
+        def _update_iterate(self, xk, ik):
+            return xk + 0.5 * (self._b[ik] - self._A[ik] @ xk) * self._A[ik]
+
+    assert [0.5, 0, 0] == list(Damped.solve(eye23, ones2, maxiter=1))
+
+    class SecondRowFirst(kaczmarz.Cyclic):
+        def _select_row_index(self, xk):
+            return 1
+
+    assert [0, 1, 0] == list(SecondRowFirst.solve(eye23, ones2, maxiter=1))
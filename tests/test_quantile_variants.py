@@ -43,8 +43,14 @@ class Window100(kaczmarz.WindowedQuantile):
         super().__init__(*args, window_size=100, **kwargs)
 
 
+class ApproximateWindow100(kaczmarz.WindowedQuantile):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, window_size=100, approximate=True, **kwargs)
+
+
 quantile_strategies.append(Sample100)
 quantile_strategies.append(Window100)
+quantile_strategies.append(ApproximateWindow100)
 
 
 @pytest.mark.parametrize("A,x_exact", get_systems())
@@ -62,3 +68,28 @@ def test_corrupted_systems(A, x_exact, QuantileStrategy):
 
     assert residual[0] > 99
     assert np.linalg.norm(residual[1:]) < tol
+
+
+def test_sampled_distances_match_numpy():
+    """The numba kernel should agree with the plain numpy computation."""
+    pytest.importorskip("numba")
+    from kaczmarz import _fast
+
+    A = np.random.normal(size=(20, 5))
+    b = np.random.normal(size=20)
+    xk = np.random.normal(size=5)
+    idxs = np.arange(0, 20, 2)
+    expected = np.abs(b[idxs] - A[idxs] @ xk)
+    assert np.allclose(expected, _fast.sampled_abs_residual(A, b, xk, idxs))
+
+
+def test_p2_quantile_estimates():
+    """The streaming estimate should land close to the exact quantile."""
+    from kaczmarz._psquare import P2Quantile
+
+    data = np.random.RandomState(0).normal(size=2000)
+    for quantile in (0.3, 0.7, 0.95):
+        p2 = P2Quantile(quantile)
+        for value in data:
+            p2.update(value)
+        assert np.abs(p2.estimate() - np.quantile(data, quantile)) < 0.1
@@ -151,3 +151,37 @@ def test_with_nonuniform_probabilities(A, x_exact, Strategy, allclose):
     x_approx = Strategy.solve(A, b, tol=tol, p=p)
     assert np.linalg.norm(A @ (x_approx - x_exact) / row_norms) < tol
     assert allclose(x_approx, x_exact, rtol=10 * tol)
+
+
+def test_alias_table_reconstructs_distribution():
+    """The alias tables should represent exactly the requested distribution."""
+    from kaczmarz._utils import build_alias_table
+
+    p = np.array([0.1, 0.0, 0.4, 0.3, 0.2])
+    prob, alias = build_alias_table(p)
+    reconstructed = np.copy(prob)
+    for bucket in range(len(p)):
+        reconstructed[alias[bucket]] += 1 - prob[bucket]
+    assert np.allclose(p, reconstructed / len(p))
+
+
+def test_alias_table_rejects_invalid_weights():
+    """Invalid sampling weights should fail loudly, like np.random.choice."""
+    from kaczmarz._utils import build_alias_table
+
+    with pytest.raises(ValueError):
+        build_alias_table([0.5, -0.5, 1.0])
+    with pytest.raises(ValueError):
+        build_alias_table([np.nan, 1.0])
+    with pytest.raises(ValueError):
+        build_alias_table([0.0, 0.0])
+
+
+def test_unnormalized_probabilities_raise(eye33, ones3):
+    """``p`` not summing to 1 should fail loudly, like np.random.choice."""
+    with pytest.raises(ValueError):
+        kaczmarz.Random.solve(eye33, ones3, p=np.ones(3))
+    iterator = iter(kaczmarz.Random.iterates(eye33, ones3, p=np.ones(3)))
+    next(iterator)  # The initial iterate is returned before any selection.
+    with pytest.raises(ValueError):
+        next(iterator)